@@ -7,6 +7,15 @@ from dateutil.relativedelta import relativedelta
 import os
 import sys
 import re
+import time
+import hashlib
+import threading
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+#Imports for Arrow-backed multi-file loading (kept in a light module for the process pool workers)
+import pyarrow as pa
+from sales_loader import load_sales_data, resolve_input_files, get_file_signatures, ignore_interrupts
 
 #Imports for AI integration
 from autogen import AssistantAgent, UserProxyAgent
@@ -30,6 +39,26 @@ llama_config = {
 
 #region #Plotting Functions
 
+#Generates the main revenue by salesperson chart.
+def plot_sales_per_salesperson(df, timestamp, color_map):
+    salesman_totals = df.groupby('Nome_Vendedor')['Valor_Total'].sum().sort_values(ascending=False)
+    os.makedirs("results/total_amount_of_sales", exist_ok=True)
+    total_amount_of_sales_path = f"results/total_amount_of_sales/sales_per_salesperson_{timestamp}.png"
+    
+    colors_original = [color_map.get(v, 'gray') for v in salesman_totals.index]
+    plt.figure(figsize=(10, 6))
+    plt.bar(salesman_totals.index, salesman_totals.values, color=colors_original)
+    plt.gca().bar_label(plt.gca().containers[0], labels=[f"R$ {v:,.2f}" for v in salesman_totals.values], padding=2)
+    plt.xlabel('Vendedor')
+    plt.ylabel('Total Vendido (R$)')
+    plt.title('Total de Vendas por Vendedor')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(total_amount_of_sales_path)
+    plt.close()
+    print(f"Gráfico de vendas por vendedor salvo em: {total_amount_of_sales_path}")
+    return total_amount_of_sales_path
+
 #Generates a chart with the top 10 customer types by revenue.
 def plot_top_customers(df, timestamp):
     try:
@@ -359,24 +388,51 @@ def plot_revenue_vs_profit(df, timestamp):
         print(f"AVISO: Não foi possível gerar o gráfico de Faturamento vs. Lucro. Coluna não encontrada: {e}. Pulando...", file=sys.stderr)
         return None
 
+#Last economic series fetched and the date they were fetched on (the BCB publishes at most once a day).
+economic_data_cache = {'date': None, 'data': None}
+
+#Fetches real economic data from the Central Bank of Brazil, reusing the series already fetched today.
+#If a new fetch fails, the last series fetched are returned instead.
+def fetch_economic_indicators():
+    end_date = date.today()
+    if economic_data_cache['date'] == end_date:
+        return economic_data_cache['data']
+
+    try:
+        ipca_data, selic_data = download_economic_indicators(end_date)
+    except Exception as e:
+        if economic_data_cache['data'] is None:
+            raise
+        print(f"AVISO: Não foi possível atualizar os dados econômicos. Erro: {e}. Usando os dados de {economic_data_cache['date']:%d/%m/%Y}.", file=sys.stderr)
+        return economic_data_cache['data']
+
+    economic_data_cache['date'] = end_date
+    economic_data_cache['data'] = (ipca_data, selic_data)
+    return ipca_data, selic_data
+
+#Downloads the IPCA and SELIC series for the 24 months up to end_date.
+def download_economic_indicators(end_date):
+    print("Buscando dados econômicos do Banco Central do Brasil...")
+    #Define a 24-month date range for fetching data.
+    start_date = end_date - relativedelta(months=24)
+    
+    start_str = start_date.strftime('%Y-%m-%d')
+    end_str = end_date.strftime('%Y-%m-%d')
+
+    #Fetch data for IPCA (Inflation) and SELIC (Interest Rate).
+    ipca_data = sgs.get({'ipca': 433}, start=start_str, end=end_str)
+    selic_data = sgs.get({'selic': 432}, start=start_str, end=end_str)
+    
+    #Resample daily SELIC data to monthly mean for a cleaner chart.
+    if not selic_data.empty:
+        selic_data = selic_data.resample('M').mean()
+
+    return ipca_data, selic_data
+
 #Fetches and plots real economic data from the Central Bank of Brazil.
 def plot_economic_indicators(timestamp):
     try:
-        print("Buscando dados econômicos do Banco Central do Brasil...")
-        #Define a 24-month date range for fetching data.
-        end_date = date.today()
-        start_date = end_date - relativedelta(months=24)
-        
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-
-        #Fetch data for IPCA (Inflation) and SELIC (Interest Rate).
-        ipca_data = sgs.get({'ipca': 433}, start=start_str, end=end_str)
-        selic_data = sgs.get({'selic': 432}, start=start_str, end=end_str)
-        
-        #Resample daily SELIC data to monthly mean for a cleaner chart.
-        if not selic_data.empty:
-            selic_data = selic_data.resample('M').mean()
+        ipca_data, selic_data = fetch_economic_indicators()
 
         paths = {}
         os.makedirs("results/economic_context", exist_ok=True)
@@ -509,44 +565,40 @@ def assemble_final_report(ai_text_response, graph_paths):
     return ai_text_response
 #endregion
 
-#region #Main Execution Block
-if __name__ == '__main__':
-    #region #Data Loading and Cleaning
-    try:
-        df = pd.read_csv('sales.csv', index_col=0, na_values=['NA'], delimiter=";", header=0)
-    except FileNotFoundError:
-        print("ERRO: O arquivo 'sales.csv' não foi encontrado. Verifique se o arquivo está no mesmo diretório que o script.", file=sys.stderr)
-        sys.exit(1)
+#region #Report Pipeline Functions
 
-    #Helper function to clean numeric columns that may come as text with commas.
-    def clean_numeric_column(series):
-        if series.dtype in ('object', 'str', 'string'):
-            return series.astype(str).str.replace(',', '.').astype('double')
-        return series
-
-    #Checks if all required columns exist in the file.
-    required_cols = ['Valor_Unitario', 'Custo_Unitario', 'Desconto_Aplicado_Percent', 'Quantidade', 'Nome_Vendedor', 'Nome_Produto', 'Categoria', 'Tipo_Cliente', 'Metodo_Pagamento', 'Canal_Venda', 'Status_Venda']
-    for col in required_cols:
-        if col not in df.columns:
-            print(f"ERRO: A coluna obrigatória '{col}' não foi encontrada no arquivo 'sales.csv'.", file=sys.stderr)
-            sys.exit(1)
-
-    #Applies cleaning and calculates metric columns (Total Value, Total Cost, Profit).
-    df['Valor_Unitario'] = clean_numeric_column(df['Valor_Unitario'])
-    df['Custo_Unitario'] = clean_numeric_column(df['Custo_Unitario'])
-    df['Desconto_Aplicado_Percent'] = clean_numeric_column(df['Desconto_Aplicado_Percent'])
-    
+#Calculates metric columns (Total Value, Total Cost, Profit).
+def calculate_metric_columns(df):
     df['Valor_Bruto'] = df['Valor_Unitario'] * df['Quantidade']
     df['Valor_Desconto_Reais'] = df['Valor_Bruto'] * df['Desconto_Aplicado_Percent']
     df['Valor_Total'] = df['Valor_Bruto'] - df['Valor_Desconto_Reais']
     df['Custo_Total'] = df['Custo_Unitario'] * df['Quantidade']
     df['Lucro'] = df['Valor_Total'] - df['Custo_Total']
-    
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    os.makedirs("results", exist_ok=True)
-    #endregion
-
-    #region #Chart Generation
+    return df
+
+#Sales charts: key, plotting function, the columns it reads and whether it uses the salesperson color map.
+#The column lists let watch mode skip the charts whose inputs did not change.
+CHART_STAGES = [
+    ('sales_per_salesperson', plot_sales_per_salesperson, ['Nome_Vendedor', 'Valor_Total'], True),
+    ('top_customers', plot_top_customers, ['Tipo_Cliente', 'Valor_Total'], False),
+    ('payment_methods', plot_payment_methods, ['Metodo_Pagamento'], False),
+    ('discounts', plot_discounts_by_salesperson, ['Nome_Vendedor', 'Valor_Desconto_Reais', 'Desconto_Aplicado_Percent'], True),
+    ('sales_channels', plot_sales_channels, ['Canal_Venda', 'Filial', 'Valor_Total'], False),
+    ('sales_status', plot_sales_status, ['Nome_Vendedor', 'Status_Venda', 'Quantidade'], True),
+    ('profit_by_salesperson', plot_profit_analysis, ['Nome_Vendedor', 'Lucro'], True),
+    ('products', plot_product_analysis, ['Nome_Produto', 'Categoria', 'Valor_Total'], False),
+    ('revenue_vs_profit', plot_revenue_vs_profit, ['Nome_Vendedor', 'Valor_Total', 'Lucro'], False),
+]
+
+#Returns a hash of the given columns (in row order), used to tell whether a chart's inputs changed.
+def fingerprint_columns(df, columns, extra=None):
+    present = [col for col in columns if col in df.columns]
+    row_hashes = pd.util.hash_pandas_object(df[present], index=False).values
+    return hashlib.sha1(row_hashes.tobytes() + repr((present, extra)).encode('utf-8')).hexdigest()
+
+#Generates every chart and returns a dictionary with their paths.
+#When a chart_cache dict is given, charts whose input columns did not change since the last call are reused.
+def generate_charts(df, timestamp, chart_cache=None):
     #Creates a color map to maintain visual consistency for salespeople across charts.
     vendedores = df['Nome_Vendedor'].unique()
     cmap = plt.get_cmap('tab20', len(vendedores))
@@ -554,61 +606,64 @@ if __name__ == '__main__':
 
     #Dictionary to store the paths of the generated charts.
     graph_paths = {}
+    reused = 0
+
+    print("\nGerando gráficos...")
+    for key, plot_function, columns, uses_color_map in CHART_STAGES:
+        fingerprint = None
+        if chart_cache is not None:
+            #The color map depends on the order salespeople appear in, so it is part of the fingerprint.
+            fingerprint = fingerprint_columns(df, columns, tuple(vendedores) if uses_color_map else None)
+            if key in chart_cache and chart_cache[key][0] == fingerprint:
+                graph_paths.update(chart_cache[key][1])
+                reused += 1
+                continue
+
+        if uses_color_map:
+            result = plot_function(df, timestamp, color_map)
+        else:
+            result = plot_function(df, timestamp)
+
+        #Some functions return a single path and others a dictionary with several charts.
+        paths = result if isinstance(result, dict) else {key: result}
+        if chart_cache is not None:
+            chart_cache[key] = (fingerprint, paths)
+        graph_paths.update(paths)
+
+    if reused:
+        print(f"{reused} gráfico(s) sem alterações nos dados foram reaproveitados.")
+
+    #Economic charts do not depend on the sales data, so they are cached separately.
+    if chart_cache is not None:
+        economic_paths = plot_cached_economic_indicators(timestamp, chart_cache)
+    else:
+        economic_paths = plot_economic_indicators(timestamp)
+    if economic_paths: graph_paths.update(economic_paths)
 
-    #Generates the main revenue by salesperson chart.
-    salesman_totals = df.groupby('Nome_Vendedor')['Valor_Total'].sum().sort_values(ascending=False)
-    os.makedirs("results/total_amount_of_sales", exist_ok=True)
-    total_amount_of_sales_path = f"results/total_amount_of_sales/sales_per_salesperson_{timestamp}.png"
-    
-    colors_original = [color_map.get(v, 'gray') for v in salesman_totals.index]
-    plt.figure(figsize=(10, 6))
-    plt.bar(salesman_totals.index, salesman_totals.values, color=colors_original)
-    plt.gca().bar_label(plt.gca().containers[0], labels=[f"R$ {v:,.2f}" for v in salesman_totals.values], padding=2)
-    plt.xlabel('Vendedor')
-    plt.ylabel('Total Vendido (R$)')
-    plt.title('Total de Vendas por Vendedor')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(total_amount_of_sales_path)
-    plt.close()
-    print(f"Gráfico de vendas por vendedor salvo em: {total_amount_of_sales_path}")
-
-    #Calls all plotting functions and stores their paths.
-    print("\nGerando gráficos adicionais...")
-    graph_paths['top_customers'] = plot_top_customers(df, timestamp)
-    graph_paths['payment_methods'] = plot_payment_methods(df, timestamp)
-    
-    discounts_paths = plot_discounts_by_salesperson(df, timestamp, color_map)
-    if discounts_paths: graph_paths.update(discounts_paths)
-
-    channels_paths = plot_sales_channels(df, timestamp)
-    if channels_paths: graph_paths.update(channels_paths)
-
-    status_paths = plot_sales_status(df, timestamp, color_map)
-    if status_paths: graph_paths.update(status_paths)
-    
-    graph_paths['profit_by_salesperson'] = plot_profit_analysis(df, timestamp, color_map)
-    
-    product_paths = plot_product_analysis(df, timestamp)
-    if product_paths: graph_paths.update(product_paths)
+    print("\nProcesso de geração de gráficos concluído.")
+    return graph_paths
 
-    graph_paths['revenue_vs_profit'] = plot_revenue_vs_profit(df, timestamp)
+#Plots the economic charts only when newer series were fetched, otherwise reuses the last ones drawn.
+def plot_cached_economic_indicators(timestamp, chart_cache):
+    previous_paths = chart_cache.get('economic', (None, None))[1]
+    try:
+        fetch_economic_indicators()
+    except Exception as e:
+        print(f"AVISO: Não foi possível buscar os dados econômicos. Erro: {e}. Pulando...", file=sys.stderr)
+        return previous_paths
 
-    economic_paths = plot_economic_indicators(timestamp)
-    if economic_paths: graph_paths.update(economic_paths)
+    fingerprint = economic_data_cache['date']
+    if previous_paths and chart_cache['economic'][0] == fingerprint:
+        return previous_paths
 
-    print("\nProcesso de geração de gráficos concluído.")
-    #endregion
+    paths = plot_economic_indicators(timestamp)
+    if not paths:
+        return previous_paths
+    chart_cache['economic'] = (fingerprint, paths)
+    return paths
 
-    #region #AI Insight Generation
-    print("\n--- Gerando Insights com o Especialista Focado ---")
-    
-    #Generates the text summary with data for the AI.
-    textual_summary_for_ai = generate_textual_insights(df)
-    if "Não foi possível" in textual_summary_for_ai:
-        print(textual_summary_for_ai)
-        sys.exit(1)
-    
+#Creates the AI agents used to write the report.
+def create_ai_agents():
     #Creates the single, highly-instructed specialist agent.
     analyst_agent = AssistantAgent(
         name="Analista_Especialista_Senior",
@@ -652,6 +707,10 @@ if __name__ == '__main__':
         code_execution_config=False,
     )
 
+    return analyst_agent, user_proxy
+
+#Asks the AI for the narrative report and saves it alongside the charts.
+def generate_ai_report(analyst_agent, user_proxy, textual_summary_for_ai, graph_paths, timestamp):
     #Defines the task prompt, including date and location.
     today = date.today().strftime("%d de %B de %Y")
     location = "Jaraguá do Sul, SC, Brasil"
@@ -695,5 +754,178 @@ if __name__ == '__main__':
         print(final_report_md)
     else:
         print("\nNão foi possível obter uma resposta da IA. Verifique as configurações, a chave da API e o prompt do sistema.")
+#endregion
+
+#region #Watch Mode Functions
+
+#Returns the signatures of the current input files, or an empty dict while they are missing (e.g. mid-export).
+def snapshot_input_files(input_path):
+    try:
+        return get_file_signatures(resolve_input_files(input_path))
+    except FileNotFoundError:
+        return {}
+
+#Blocks until the input files change and then stay unchanged for the whole debounce window.
+def wait_for_input_change(input_path, last_snapshot, poll_interval, debounce, on_idle=None):
+    while True:
+        time.sleep(poll_interval)
+        current = snapshot_input_files(input_path)
+        if current == last_snapshot:
+            if on_idle:
+                on_idle()
+            continue
+
+        #Waits for the writer to finish: every new change restarts the debounce window.
+        while True:
+            time.sleep(debounce)
+            settled = snapshot_input_files(input_path)
+            if settled == current:
+                return settled
+            current = settled
+
+#Watch mode overwrites a stable set of files instead of creating a new timestamped set on every refresh.
+WATCH_TIMESTAMP = "latest"
+
+#Runs one refresh cycle, re-running only the stages affected by the change and reusing the warm state.
+def refresh_report(args, state, executor):
+    df = load_sales_data(args.input, max_workers=args.workers, file_cache=state['file_cache'], executor=executor)
+    df = calculate_metric_columns(df)
+
+    #Skips the charts when the files were touched but the data itself did not change.
+    fingerprint = fingerprint_columns(df, list(df.columns))
+    if fingerprint == state['fingerprint']:
+        print("Os dados não mudaram desde o último relatório. Mantendo os gráficos anteriores.")
+        return
+
+    os.makedirs("results", exist_ok=True)
+
+    state['graph_paths'] = generate_charts(df, WATCH_TIMESTAMP, chart_cache=state['chart_cache'])
+    state['df'] = df
+    state['fingerprint'] = fingerprint
+    refresh_ai_report(args, state)
+
+#Writes the AI report. Runs on a background thread so file changes keep being charted meanwhile.
+def run_ai_report(state, df, graph_paths):
+    try:
+        print("\n--- Gerando Insights com o Especialista Focado ---")
+        textual_summary_for_ai = generate_textual_insights(df)
+        if "Não foi possível" in textual_summary_for_ai:
+            print(textual_summary_for_ai, file=sys.stderr)
+            return
+
+        if state['agents'] is None:
+            state['agents'] = create_ai_agents()
+        analyst_agent, user_proxy = state['agents']
+        generate_ai_report(analyst_agent, user_proxy, textual_summary_for_ai, graph_paths, WATCH_TIMESTAMP)
+    except Exception as e:
+        print(f"ERRO: Não foi possível gerar o relatório da IA. Erro: {e}", file=sys.stderr)
+
+#Starts the AI stage only when the data changed since the last report, the AI interval has elapsed and no other AI report is in flight.
+def refresh_ai_report(args, state):
+    if state['df'] is None or state['ai_fingerprint'] == state['fingerprint']:
+        return
+    if state['ai_thread'] is not None and state['ai_thread'].is_alive():
+        return
+    if state['last_ai_run'] is not None and time.monotonic() - state['last_ai_run'] < args.ai_interval:
+        return
+
+    #Recorded before the call, so a failed AI call also waits out the interval.
+    state['ai_fingerprint'] = state['fingerprint']
+    state['last_ai_run'] = time.monotonic()
+    state['ai_thread'] = threading.Thread(target=run_ai_report, args=(state, state['df'], dict(state['graph_paths'])), daemon=True)
+    state['ai_thread'].start()
+
+#Keeps the process resident, re-rendering the report whenever the input files change.
+def watch_sales_data(args):
+    state = {
+        'file_cache': {},
+        'chart_cache': {},
+        'df': None,
+        'fingerprint': None,
+        'graph_paths': {},
+        'agents': None,
+        'ai_fingerprint': None,
+        'last_ai_run': None,
+        'ai_thread': None,
+    }
+
+    #Errors in a single cycle are reported without stopping the watcher.
+    def run_safely(stage, *stage_args):
+        try:
+            stage(*stage_args)
+        except Exception as e:
+            print(f"ERRO: Não foi possível atualizar o relatório. Erro: {e}", file=sys.stderr)
+
+    try:
+        #The process pool is kept alive so its workers stay warm between cycles.
+        #Its workers ignore Ctrl+C, which is handled here in the main process.
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=ignore_interrupts) as executor:
+            snapshot = snapshot_input_files(args.input)
+            run_safely(refresh_report, args, state, executor)
+            print(f"\nObservando '{args.input}' por alterações (Ctrl+C para sair)...")
+            while True:
+                snapshot = wait_for_input_change(args.input, snapshot, args.poll_interval, args.debounce, on_idle=lambda: run_safely(refresh_ai_report, args, state))
+                print(f"\nAlteração detectada em '{args.input}'. Atualizando o relatório...")
+                run_safely(refresh_report, args, state, executor)
+    except KeyboardInterrupt:
+        print("\nModo de observação encerrado.")
+#endregion
+
+#region #Main Execution Block
+#Argparse type for options that must be a whole number greater than zero.
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"deve ser um número inteiro maior que zero (recebido: {value})")
+    return number
+
+if __name__ == '__main__':
+    #region #Data Loading and Cleaning
+    parser = argparse.ArgumentParser(description="Gera gráficos e um relatório com IA a partir das vendas.")
+    parser.add_argument("input", nargs="?", default="sales.csv", help="Arquivo CSV, diretório ou padrão glob (ex: 'exports/*.csv'). Padrão: sales.csv")
+    parser.add_argument("--workers", type=positive_int, default=None, help="Número de processos para ler múltiplos arquivos em paralelo.")
+    parser.add_argument("--watch", action="store_true", help="Mantém o processo ativo e gera o relatório novamente sempre que os arquivos de entrada mudarem.")
+    parser.add_argument("--debounce", type=float, default=2.0, help="Segundos sem novas alterações antes de gerar o relatório no modo --watch. Padrão: 2")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Intervalo em segundos entre verificações dos arquivos no modo --watch. Padrão: 1")
+    parser.add_argument("--ai-interval", type=float, default=900.0, help="Intervalo mínimo em segundos entre relatórios da IA no modo --watch. Padrão: 900")
+    args = parser.parse_args()
+
+    if args.watch:
+        watch_sales_data(args)
+        sys.exit(0)
+
+    try:
+        df = load_sales_data(args.input, max_workers=args.workers)
+    except FileNotFoundError as e:
+        print(f"ERRO: Não foi possível ler os dados de vendas. {e} Verifique o caminho informado.", file=sys.stderr)
+        sys.exit(1)
+    except KeyError as e:
+        print(f"ERRO: {e.args[0]}", file=sys.stderr)
+        sys.exit(1)
+    except pa.ArrowInvalid as e:
+        print(f"ERRO: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    df = calculate_metric_columns(df)
+    
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    os.makedirs("results", exist_ok=True)
+    #endregion
+
+    #region #Chart Generation
+    graph_paths = generate_charts(df, timestamp)
+    #endregion
+
+    #region #AI Insight Generation
+    print("\n--- Gerando Insights com o Especialista Focado ---")
+    
+    #Generates the text summary with data for the AI.
+    textual_summary_for_ai = generate_textual_insights(df)
+    if "Não foi possível" in textual_summary_for_ai:
+        print(textual_summary_for_ai)
+        sys.exit(1)
+    
+    analyst_agent, user_proxy = create_ai_agents()
+    generate_ai_report(analyst_agent, user_proxy, textual_summary_for_ai, graph_paths, timestamp)
     #endregion
-#endregion
\ No newline at end of file
+#endregion
@@ -0,0 +1,160 @@
+#region #Imports
+#This module is imported by every process pool worker, so it must stay light: only pyarrow and the standard library.
+import os
+import sys
+import csv
+import signal
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.compute as pc
+#endregion
+
+#region #Data Loading Functions
+#Columns that every input file must contain.
+REQUIRED_COLUMNS = ['Valor_Unitario', 'Custo_Unitario', 'Desconto_Aplicado_Percent', 'Quantidade', 'Nome_Vendedor', 'Nome_Produto', 'Categoria', 'Tipo_Cliente', 'Metodo_Pagamento', 'Canal_Venda', 'Status_Venda']
+
+#Numeric columns that may come as text with commas as the decimal separator.
+NUMERIC_TEXT_COLUMNS = ['Valor_Unitario', 'Custo_Unitario', 'Desconto_Aplicado_Percent']
+
+#Integer columns. Every other column is read as text, so all files share the same schema.
+INTEGER_COLUMNS = ['Quantidade']
+
+#Helper function to clean numeric columns that may come as text with commas.
+def clean_numeric_column(column):
+    return pc.cast(pc.replace_substring(column, ',', '.'), pa.float64())
+
+#Values treated as missing: the same default markers pandas.read_csv uses, which the original loader relied on.
+NULL_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+#Reads only the header line of a CSV file, honoring quoted column names.
+def read_header(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f, delimiter=';'), [])
+
+#Resolves the input argument (single file, directory or glob pattern) into a sorted list of CSV files.
+def resolve_input_files(input_path):
+    if os.path.isdir(input_path):
+        files = glob.glob(os.path.join(input_path, "*.csv"))
+    elif glob.has_magic(input_path):
+        files = glob.glob(input_path)
+    else:
+        return [input_path]
+
+    files = sorted(files)
+    if not files:
+        raise FileNotFoundError(f"Nenhum arquivo CSV encontrado em '{input_path}'.")
+    return files
+
+#Parses and cleans a single CSV file, returning it as an Arrow table plus throughput statistics.
+#Runs inside a worker process, so it must stay at module level to be picklable.
+def load_sales_file(path):
+    start = time.perf_counter()
+    columns = read_header(path)
+
+    #Checks if all required columns exist in the file.
+    for col in REQUIRED_COLUMNS:
+        if col not in columns:
+            raise KeyError(f"A coluna obrigatória '{col}' não foi encontrada no arquivo '{path}'.")
+
+    column_types = {col: pa.int64() if col in INTEGER_COLUMNS else pa.string() for col in columns}
+    try:
+        table = pa_csv.read_csv(
+            path,
+            parse_options=pa_csv.ParseOptions(delimiter=";"),
+            convert_options=pa_csv.ConvertOptions(column_types=column_types, null_values=NULL_VALUES, strings_can_be_null=True),
+        )
+
+        #Applies the same cleaning rules to every file.
+        for col in NUMERIC_TEXT_COLUMNS:
+            index = table.schema.get_field_index(col)
+            table = table.set_column(index, col, clean_numeric_column(table.column(col)))
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise pa.ArrowInvalid(f"Não foi possível interpretar o arquivo '{path}': {e}")
+
+    elapsed = time.perf_counter() - start
+    return table, {'path': path, 'rows': table.num_rows, 'bytes': os.path.getsize(path), 'seconds': elapsed}
+
+#Drops the rows whose sale ID was already read from a previous file, using a hash set of the IDs seen so far.
+#Repeated IDs inside a single file are kept, as they always were.
+def find_duplicate_sales(tables, id_column):
+    seen = None
+    deduplicated = []
+    duplicates = []
+    for table in tables:
+        ids = table.column(id_column)
+        if seen is not None:
+            is_duplicate = pc.fill_null(pc.is_in(ids, value_set=seen), False)
+            count = pc.sum(is_duplicate).as_py() or 0
+            if count:
+                duplicates.extend(pc.filter(ids, is_duplicate).to_pylist())
+                table = table.filter(pc.invert(is_duplicate))
+
+        file_ids = pc.unique(ids)
+        seen = file_ids if seen is None else pc.unique(pa.concat_arrays([seen, file_ids]))
+        deduplicated.append(table)
+    return deduplicated, duplicates
+
+#Process pool initializer: Ctrl+C is handled by the main process, not by every worker.
+def ignore_interrupts():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+#Returns the (modification time, size) signature of each input file, used to detect changes.
+def get_file_signatures(files):
+    signatures = {}
+    for path in files:
+        stat = os.stat(path)
+        signatures[path] = (stat.st_mtime_ns, stat.st_size)
+    return signatures
+
+#Loads one or more sales files in parallel and combines them into a single DataFrame.
+#When a file_cache dict is given, files whose signature did not change since the last call are not parsed again.
+#When an executor is given, it is reused instead of spawning a new process pool.
+def load_sales_data(input_path, max_workers=None, file_cache=None, executor=None):
+    files = resolve_input_files(input_path)
+    signatures = get_file_signatures(files)
+    if file_cache is None:
+        file_cache = {}
+
+    #Forgets files that are no longer part of the input.
+    for path in list(file_cache):
+        if path not in signatures:
+            del file_cache[path]
+
+    pending = [path for path in files if path not in file_cache or file_cache[path][0] != signatures[path]]
+
+    #A single file does not pay off the cost of spawning a process pool.
+    if len(pending) <= 1 and executor is None:
+        results = [load_sales_file(path) for path in pending]
+    elif executor is not None:
+        results = list(executor.map(load_sales_file, pending))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(load_sales_file, pending))
+
+    for path, (table, stats) in zip(pending, results):
+        file_cache[path] = (signatures[path], table)
+        throughput = stats['bytes'] / (1024 * 1024) / stats['seconds'] if stats['seconds'] > 0 else float('inf')
+        print(f"Arquivo '{path}' lido: {stats['rows']} linhas em {stats['seconds']:.3f}s ({throughput:,.2f} MB/s)")
+
+    tables = [file_cache[path][1] for path in files]
+
+    #The first column is the sale identifier, as in the original single-file layout.
+    id_column = tables[0].schema.names[0]
+    for table, path in zip(tables, files):
+        if table.schema.names[0] != id_column:
+            raise KeyError(f"O arquivo '{path}' não começa com a coluna '{id_column}'.")
+
+    tables, duplicates = find_duplicate_sales(tables, id_column)
+    if duplicates:
+        examples = ", ".join(str(sale_id) for sale_id in duplicates[:5])
+        print(f"AVISO: {len(duplicates)} linha(s) com '{id_column}' já lido de outro arquivo foram descartadas (ex: {examples}). Mantendo a primeira ocorrência.", file=sys.stderr)
+
+    #The data stays in Arrow until this point and is converted to pandas only once, for the whole dataset.
+    combined = pa.concat_tables(tables, promote_options="permissive")
+    df = combined.to_pandas(split_blocks=True)
+    return df.set_index(id_column)
+#endregion